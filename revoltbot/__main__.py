@@ -1,17 +1,33 @@
 import asyncio
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 import warnings
-from pprint import pprint
 from types import TracebackType
+from typing import Any, Optional
 
 from dotenv import load_dotenv
 from mutiny import Client, events
-from ulid import monotonic as ulid
 
 from .dev import Dev
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    from orjson import dumps as json_dumps
+except ImportError:
+
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+
 load_dotenv()
 load_dotenv(".env.user")
 
@@ -33,22 +49,68 @@ def excepthook(
     log.critical("Unhandled exception occurred", exc_info=(type_, value, traceback))
 
 
-def setup_logging():
+class BufferedFileHandler(logging.FileHandler):
+    """File handler that only flushes its (larger) buffer in `flush_buffer()`."""
+
+    def _open(self):
+        return open(
+            self.baseFilename,
+            self.mode,
+            buffering=64 * 1024,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+    def flush(self) -> None:
+        # StreamHandler.emit() calls this after every record
+        pass
+
+    def flush_buffer(self) -> None:
+        super().flush()
+
+
+class BatchingMemoryHandler(logging.handlers.MemoryHandler):
+    """Memory handler that also flushes its target after handing over a batch."""
+
+    def flush(self) -> None:
+        super().flush()
+        if isinstance(self.target, BufferedFileHandler):
+            self.target.flush_buffer()
+
+
+def setup_logging() -> None:
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
-    file_handler = logging.FileHandler("latest.log")
+    file_handler = BufferedFileHandler("latest.log", encoding="utf-8")
     formatter = logging.Formatter(
         "[%(asctime)s] [%(levelname)s] %(name)s: %(message)s", datefmt="%X"
     )
     file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
+    memory_handler = BatchingMemoryHandler(
+        capacity=512,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+        flushOnClose=True,
+    )
+    atexit.register(memory_handler.flush)
     stream_handler = logging.StreamHandler()
-    root_logger.addHandler(stream_handler)
+    # the actual I/O happens on the listener's thread, away from the event loop
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(
+        log_queue, memory_handler, stream_handler
+    )
+    listener.start()
+    # atexit runs after sys.excepthook, so crashes still make it to the handlers,
+    # and stop() drains the queue before the daemon listener thread is killed
+    atexit.register(listener.stop)
     sys.excepthook = excepthook
 
 
 setup_logging()
 log = logging.getLogger("revoltbot")
+# raise this logger's level (e.g. through eval) to stop dumping raw events
+events_log = logging.getLogger("revoltbot.events")
 
 
 class MyDev(Dev):
@@ -57,40 +119,80 @@ class MyDev(Dev):
 
 
 dev = MyDev(client)
+_URL_CACHE: dict[str, str] = {}
+_JSON_HEADERS: Optional[dict[str, str]] = None
+_SMILEY_HEAD = "\N{SMILING FACE WITH OPEN MOUTH}\n"
+_SMILEY_TAIL = "\n\N{SMILING FACE WITH OPEN MOUTH}"
 
 
 async def send(client: Client, channel_id: str, content: str) -> None:
+    global _JSON_HEADERS
     rest = client._rest
-    nonce = ulid.new().str
-    smiley = "\N{SMILING FACE WITH OPEN MOUTH}"
+    # rest.headers doesn't change after login so the merged dict can be reused
+    if _JSON_HEADERS is None:
+        _JSON_HEADERS = {**rest.headers, "Content-Type": "application/json"}
+    url = _URL_CACHE.get(channel_id)
+    if url is None:
+        url = _URL_CACHE[channel_id] = f"{rest.api_url}/channels/{channel_id}/messages"
+    nonce = os.urandom(12).hex()
+    body = _SMILEY_HEAD + content + _SMILEY_TAIL
+    payload = json_dumps({"content": body, "nonce": nonce})
     await rest.request(
         "POST",
-        f"{rest.api_url}/channels/{channel_id}/messages",
-        json={"content": f"{smiley}\n{content}\n{smiley}", "nonce": nonce},
-        headers=rest.headers,
+        url,
+        data=payload,
+        headers=_JSON_HEADERS,
     )
 
 
-@client.listen()
-async def on_event(event: events.Event):
-    if type(event) in (
+_IGNORED_EVENTS = frozenset(
+    {
         events.ChannelStartTypingEvent,
         events.ChannelStopTypingEvent,
         events.UserUpdateEvent,
-    ):
+    }
+)
+
+
+@client.listen()
+async def on_event(event: events.Event):
+    if type(event) in _IGNORED_EVENTS:
         return
-    pprint(event.raw_data)
+    if events_log.isEnabledFor(logging.DEBUG):
+        events_log.debug("event: %s", event.raw_data)
+
+
+_OWNER_ID: Optional[str] = None
 
 
 @client.listen()
 async def on_ready(event: events.ReadyEvent):
+    global _OWNER_ID
+    _OWNER_ID = client._state.user.bot.owner_id
     log.info("--- I am ready! ---")
 
 
+async def _ping(channel_id: str, body: str, event: events.MessageEvent) -> None:
+    await send(client, channel_id, "Pong!")
+
+
+async def _shutdown(channel_id: str, body: str, event: events.MessageEvent) -> None:
+    await send(client, channel_id, "Shutting down...")
+    await client.close()
+
+
+COMMANDS = {
+    f"{PREFIX}ping": _ping,
+    f"{PREFIX}shutdown": _shutdown,
+    f"{PREFIX}eval": dev.eval,
+    f"{PREFIX}debug": dev.debug,
+}
+
+
 @client.listen()
 async def on_message(event: events.MessageEvent):
     msg = event.message
-    if msg.author_id != client._state.user.bot.owner_id:
+    if msg.author_id != _OWNER_ID:
         return
 
     if msg.content is None:
@@ -98,23 +200,11 @@ async def on_message(event: events.MessageEvent):
     parts = msg.content.split(maxsplit=1)
     if not parts:
         return
-    command = parts[0]
-    body = parts[1] if len(parts) == 2 else ""
-    if command == f"{PREFIX}ping":
-        await send(client, msg.channel_id, "Pong!")
-        return
-    if command == f"{PREFIX}shutdown":
-        await send(client, msg.channel_id, "Shutting down...")
-        await client.close()
-        return
-
-    if not body:
+    handler = COMMANDS.get(parts[0])
+    if handler is None:
         return
-
-    if command == f"{PREFIX}eval":
-        await dev.eval(msg.channel_id, body, event)
-    elif command == f"{PREFIX}debug":
-        await dev.debug(msg.channel_id, body, event)
+    body = parts[1] if len(parts) == 2 else ""
+    await handler(msg.channel_id, body, event)
 
 
 def _cancel_all_tasks(loop: asyncio.AbstractEventLoop) -> None:
@@ -125,9 +215,15 @@ def _cancel_all_tasks(loop: asyncio.AbstractEventLoop) -> None:
     for task in to_cancel:
         task.cancel()
 
-    loop.run_until_complete(asyncio.gather(*to_cancel, return_exceptions=True))
+    # unlike wait_for(), wait() doesn't cancel the tasks again once it times out
+    done, pending = loop.run_until_complete(asyncio.wait(to_cancel, timeout=5))
+    if pending:
+        log.warning(
+            "%s task(s) did not finish within 5 seconds of being cancelled",
+            len(pending),
+        )
 
-    for task in to_cancel:
+    for task in done:
         if task.cancelled():
             continue
         if (exception := task.exception()) is not None:
@@ -141,7 +237,13 @@ def _cancel_all_tasks(loop: asyncio.AbstractEventLoop) -> None:
 
 
 def main() -> None:
-    loop = asyncio.new_event_loop()
+    if uvloop is not None:
+        loop = uvloop.new_event_loop()
+    else:
+        loop = asyncio.new_event_loop()
+    # eager_task_factory is only available on Python 3.12+
+    if (eager_task_factory := getattr(asyncio, "eager_task_factory", None)) is not None:
+        loop.set_task_factory(eager_task_factory)
     asyncio.set_event_loop(loop)
     try:
         loop.run_until_complete(client.start())
@@ -151,7 +253,6 @@ def main() -> None:
         try:
             loop.run_until_complete(client.close())
             _cancel_all_tasks(loop)
-            loop.run_until_complete(asyncio.sleep(5))
             loop.run_until_complete(loop.shutdown_asyncgens())
             loop.run_until_complete(loop.shutdown_default_executor())
         finally:
@@ -17,6 +17,7 @@
 
 import ast
 import asyncio
+import functools
 import inspect
 import io
 import textwrap
@@ -31,7 +32,7 @@ from typing import Any, no_type_check
 import aiohttp
 import mutiny
 
-START_CODE_BLOCK_RE = re.compile(r"^((```py(thon)?)(?=\s)|(```))")
+START_CODE_BLOCK_RE = re.compile(r"^```(?:py(?:thon)?(?=\s))?")
 
 
 @no_type_check
@@ -43,35 +44,48 @@ def pagify(
     shorten_by: int = 12,
     page_length: int = 2000,
 ) -> Generator[str, None, None]:
-    in_text = text
     page_length -= shorten_by
-    while len(in_text) > page_length:
-        this_page_len = page_length
-        closest_delim = (in_text.rfind(d, 1, this_page_len) for d in delims)
+    pos = 0
+    text_length = len(text)
+    # slice pages off the original string instead of re-slicing the remainder
+    while text_length - pos > page_length:
+        window_end = pos + page_length
+        closest_delim = (text.rfind(d, pos + 1, window_end) for d in delims)
         if priority:
-            closest_delim = next((x for x in closest_delim if x > 0), -1)
+            closest_delim = next((x for x in closest_delim if x != -1), -1)
         else:
             closest_delim = max(closest_delim)
-        closest_delim = closest_delim if closest_delim != -1 else this_page_len
-        to_send = in_text[:closest_delim]
+        closest_delim = closest_delim if closest_delim != -1 else window_end
+        to_send = text[pos:closest_delim]
         if len(to_send.strip()) > 0:
             yield to_send
-        in_text = in_text[closest_delim:]
+        pos = closest_delim
 
+    in_text = text[pos:]
     if len(in_text.strip()) > 0:
         yield in_text
 
 
+_MISSING = object()
+
+
+@functools.lru_cache(maxsize=256)
+def _slot_names(cls: type) -> tuple[str, ...]:
+    return tuple(
+        attr_name
+        for base in cls.__mro__
+        for attr_name in getattr(base, "__slots__", ())
+    )
+
+
 def better_vars(obj):
-    MISSING = object()
     try:
         return vars(obj)
     except TypeError:
         return {
             attr_name: value
-            for base in obj.__class__.__mro__
-            for attr_name in getattr(base, "__slots__", ())
-            if (value := getattr(obj, attr_name, MISSING)) is not MISSING
+            for attr_name in _slot_names(obj.__class__)
+            if (value := getattr(obj, attr_name, _MISSING)) is not _MISSING
         }
 
 
@@ -79,10 +93,32 @@ def bp(obj: Any) -> None:
     pprint(better_vars(obj))
 
 
+@functools.lru_cache(maxsize=128)
+def _cached_compile(source: str, filename: str, mode: str) -> Any:
+    # code objects are immutable so repeated snippets can share them
+    return compile(
+        source, filename, mode, flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT, optimize=0
+    )
+
+
 class Dev(ABC):
     def __init__(self, client: mutiny.Client) -> None:
         self.client = client
         self._last_result = None
+        auth_data = client._authentication_data
+        token = auth_data.session_token if auth_data.token is None else auth_data.token
+        assert isinstance(token, str)
+        self._token_re = re.compile(re.escape(token))
+        self._base_env = {
+            "client": self.client,
+            "asyncio": asyncio,
+            "aiohttp": aiohttp,
+            "mutiny": mutiny,
+            "better_vars": better_vars,
+            "bp": bp,
+            "pprint": pprint,
+            "__name__": "__main__",
+        }
 
     @abstractmethod
     async def send(self, channel_id: str, content: str) -> None:
@@ -97,16 +133,14 @@ class Dev(ABC):
         """Automatically removes code blocks from the code."""
         # remove ```py\n```
         if content.startswith("```") and content.endswith("```"):
-            return START_CODE_BLOCK_RE.sub("", content)[:-3]
+            return START_CODE_BLOCK_RE.sub("", content, count=1)[:-3]
 
         # remove `foo`
         return content.strip("` \n")
 
     @staticmethod
     def async_compile(source: str, filename: str, mode: str) -> Any:
-        return compile(
-            source, filename, mode, flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT, optimize=0
-        )
+        return _cached_compile(source, filename, mode)
 
     @staticmethod
     async def maybe_await(coro: Any) -> Any:
@@ -128,29 +162,20 @@ class Dev(ABC):
 
     def sanitize_output(self, input_: str) -> str:
         """Hides the bot's token from a string."""
-        auth_data = self.client._authentication_data
-        token = auth_data.session_token if auth_data.token is None else auth_data.token
-        assert isinstance(token, str)
-        return re.sub(re.escape(token), "[EXPUNGED]", input_, re.I)
+        return self._token_re.sub("[EXPUNGED]", input_)
 
     def get_environment(self, event: mutiny.events.MessageEvent) -> dict[str, Any]:
-        return {
-            "client": self.client,
-            "asyncio": asyncio,
-            "aiohttp": aiohttp,
-            "mutiny": mutiny,
-            "better_vars": better_vars,
-            "bp": bp,
-            "pprint": pprint,
-            "_": self._last_result,
-            "__name__": "__main__",
-            "event": event,
-            "message": event.message,
-        }
+        env = self._base_env.copy()
+        env["_"] = self._last_result
+        env["event"] = event
+        env["message"] = event.message
+        return env
 
     async def eval(
         self, channel_id: str, body: str, event: mutiny.events.MessageEvent
     ) -> None:
+        if not body:
+            return
         env = self.get_environment(event)
         body = self.cleanup_code(body)
         stdout = io.StringIO()
@@ -170,9 +195,8 @@ class Dev(ABC):
             with redirect_stdout(stdout):
                 result = await func()
         except Exception:
-            printed = "{}{}".format(stdout.getvalue(), traceback.format_exc())
-        else:
-            printed = stdout.getvalue()
+            traceback.print_exc(file=stdout)
+        printed = stdout.getvalue()
 
         if result is not None:
             self._last_result = result
@@ -186,6 +210,8 @@ class Dev(ABC):
     async def debug(
         self, channel_id: str, body: str, event: mutiny.events.MessageEvent
     ) -> None:
+        if not body:
+            return
         env = self.get_environment(event)
         code = self.cleanup_code(body)
 